@@ -1,16 +1,27 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+# The template pipeline leans on openpyxl specifics (style_id/has_style in
+# the style capture, delete_rows/append row bookkeeping, Comment objects),
+# so no drop-in workbook library can be swapped in behind these imports.
 from openpyxl import load_workbook, Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.comments import Comment
 from openpyxl.utils import get_column_letter
-import os
+
+try:
+    # python-calamine is a Rust XLSX parser; for value-only reads it is
+    # several times faster than openpyxl and uses far less memory
+    import python_calamine  # noqa: F401
+    _EXCEL_READ_ENGINE = 'calamine'
+except ImportError:
+    _EXCEL_READ_ENGINE = 'openpyxl'
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import subprocess
 import json
 from datetime import datetime
 import io
-import tempfile
 from typing import Dict, List, Tuple, Optional
 import re
 import math
@@ -36,15 +47,63 @@ if 'template_loaded' not in st.session_state:
 if 'generated_file' not in st.session_state:
     st.session_state.generated_file = None
 
+# Compiled once at import - both patterns run on every upload/rerun
+_SDG_RE = re.compile(r'1/(SDG\d+)')
+_EVENT_RE = re.compile(r'Event\s+(\d+)\s+(\d{4})', re.IGNORECASE)
+
+# Sheets that generate_invoice rewrites, and how many columns it writes in
+# each - the only formatting the template loader needs to capture. Untouched
+# sheets keep their formatting for free.
+_SHEET_STYLE_COLS = {
+    'Studio': 10,
+    'Print': 27,
+    'Event Summary - Core': 15,
+    'Event Summary - OAB': 15,
+}
+
+# Shared categorical dtypes for the two classification columns - once the
+# session frames carry these, comparisons, groupbys and the cost lookups
+# run on integer codes instead of per-row Python strings
+_TYPE_DTYPE = pd.CategoricalDtype(['Artwork', 'Creative Artwork', 'Digital'])
+_CORE_OAB_DTYPE = pd.CategoricalDtype(['CORE', 'OAB'])
+
+# Column configuration for the studio hours editor, built once at import
+# rather than re-allocating the column objects on every rerun
+_STUDIO_COLUMN_CONFIG = {
+    "Project Ref": st.column_config.TextColumn("Project Ref", disabled=True),
+    "Event Name": st.column_config.TextColumn("Event Name", disabled=True),
+    "Project Description": st.column_config.TextColumn("Description", disabled=True),
+    "Project Owner": st.column_config.TextColumn("Owner", disabled=True),
+    "Lines": st.column_config.NumberColumn("Lines", disabled=True, format="%d"),
+    "Studio Hours": st.column_config.NumberColumn("Hours", min_value=0, max_value=1000, step=0.25, required=True),
+    "Type": st.column_config.SelectboxColumn(
+        "Type",
+        options=["Artwork", "Creative Artwork", "Digital"],
+        default="Artwork",
+        required=True
+    ),
+    "Core/OAB": st.column_config.SelectboxColumn(
+        "Core/OAB",
+        options=["CORE", "OAB"],
+        default="CORE",
+        required=True
+    ),
+    "Studio Comment": st.column_config.TextColumn("Note", disabled=True),
+}
+
 def round_up_to_quarter(hours):
-    """Round hours up to nearest 0.25"""
+    """Round hours up to nearest 0.25.
+
+    Scalar reference implementation; the timesheet pipeline applies the
+    same rounding as a single ``np.ceil`` over the whole hours column.
+    """
     if pd.isna(hours) or hours == 0:
         return 0.0
     return math.ceil(hours * 4) / 4
 
 def convert_event_to_code(event_name: str) -> str:
     """Convert 'Event 10 2025' to 'E1025' format"""
-    match = re.search(r'Event\s+(\d+)\s+(\d{4})', event_name, re.IGNORECASE)
+    match = _EVENT_RE.search(event_name)
     if match:
         event_num = match.group(1).zfill(2)
         year = match.group(2)[-2:]
@@ -53,29 +112,54 @@ def convert_event_to_code(event_name: str) -> str:
 
 def process_timesheet(file) -> pd.DataFrame:
     """Process timesheet CSV to extract and aggregate studio hours"""
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp_file:
-        tmp_file.write(file.getbuffer())
-        tmp_path = tmp_file.name
-    
-    # Read the timesheet with encoding fallbacks
-    encodings_to_try = ["utf-8-sig", "utf-16", "latin1", "cp1252"]
+    # Sniff the encoding from the head of the upload instead of paying for
+    # up to three full-file decode failures: a BOM settles it outright, and
+    # charset-normalizer (a pandas dependency) refines the guess for
+    # BOM-less exports. latin1 stays as the never-fails fallback.
+    file.seek(0)
+    head = bytes(file.read(65536))
+    if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+        encodings_to_try = ["utf-16", "latin1"]
+    else:
+        encodings_to_try = ["utf-8-sig", "latin1", "cp1252"]
+        try:
+            from charset_normalizer import from_bytes
+            best = from_bytes(head).best()
+            guess = best.encoding.replace('_', '-') if best is not None else None
+            if guess and guess not in ("utf-8", "ascii"):
+                encodings_to_try = [guess, "utf-8-sig", "latin1"]
+        except ImportError:
+            pass
+
     timesheet_df = None
     last_exception = None
 
-    try:
-        for encoding in encodings_to_try:
+    # Dtype hints for the columns we actually use let the parser decode
+    # straight into the target buffers instead of inferring per column
+    dtype_hints = {
+        'Job Number': str,
+        'Job Description': str,
+        'Charge Code': str,
+        'Total': 'float64',
+    }
+
+    for encoding in encodings_to_try:
+        try:
+            file.seek(0)
             try:
-                timesheet_df = pd.read_csv(tmp_path, encoding=encoding)
-                break
-            except UnicodeDecodeError as exc:
-                last_exception = exc
-            except Exception as exc:
-                last_exception = exc
-                break
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+                # pyarrow parses CSV in multithreaded native code; fall back
+                # to the C engine when unavailable or when it balks at the
+                # encoding (ArrowInvalid is a ValueError)
+                timesheet_df = pd.read_csv(file, encoding=encoding, engine='pyarrow', dtype=dtype_hints)
+            except (ImportError, ValueError):
+                file.seek(0)
+                timesheet_df = pd.read_csv(file, encoding=encoding, dtype=dtype_hints)
+            break
+        except UnicodeDecodeError as exc:
+            last_exception = exc
+        except Exception as exc:
+            last_exception = exc
+            break
 
     if timesheet_df is None:
         if isinstance(last_exception, UnicodeDecodeError):
@@ -89,7 +173,7 @@ def process_timesheet(file) -> pd.DataFrame:
         return pd.DataFrame()
     
     # Extract job number prefix (e.g., SDG2161 from 1/SDG2161)
-    timesheet_df['Job_Prefix'] = timesheet_df['Job Number'].str.extract(r'1/(SDG\d+)')
+    timesheet_df['Job_Prefix'] = timesheet_df['Job Number'].str.extract(_SDG_RE)
     
     # Filter out Studio QC hours
     if 'Charge Code' in timesheet_df.columns:
@@ -103,32 +187,36 @@ def process_timesheet(file) -> pd.DataFrame:
     if sdg_jobs.empty:
         return pd.DataFrame()
     
+    # Categorical keys make the aggregation run on integer group codes
+    sdg_jobs = sdg_jobs.copy()
+    sdg_jobs['Job_Prefix'] = sdg_jobs['Job_Prefix'].astype('category')
+    sdg_jobs['Charge Code'] = sdg_jobs['Charge Code'].astype('category')
+
     # Aggregate hours by job
-    aggregated = sdg_jobs.groupby('Job_Prefix').agg({
+    aggregated = sdg_jobs.groupby('Job_Prefix', observed=True, sort=False).agg({
         'Job Description': 'first',
         'Total': 'sum',  # Sum of all hours (excluding QC)
         'Charge Code': lambda x: x.mode()[0] if not x.empty else '',
     }).reset_index()
     
-    # Rename columns
+    # Rename columns (group keys go back to plain strings at the boundary)
     aggregated.columns = ['Project Ref', 'Project Description', 'Total Hours', 'Primary Charge Code']
+    aggregated['Project Ref'] = aggregated['Project Ref'].astype(str)
     
-    # Round hours up to nearest 0.25
-    aggregated['Total Hours'] = aggregated['Total Hours'].apply(round_up_to_quarter)
-    
-    # Determine Type based on Charge Code
-    def determine_type(charge_code):
-        if pd.isna(charge_code):
-            return 'Artwork'
-        charge_code_lower = str(charge_code).lower()
-        if 'creative' in charge_code_lower:
-            return 'Creative Artwork'
-        elif 'digital' in charge_code_lower or 'tec' in charge_code_lower:
-            return 'Digital'
-        else:
-            return 'Artwork'
+    # Round hours up to nearest 0.25 (one vectorized ceil over the column)
+    hours = aggregated['Total Hours'].to_numpy(dtype='float64', na_value=0.0)
+    aggregated['Total Hours'] = np.ceil(hours * 4.0) / 4.0
     
-    aggregated['Type'] = aggregated['Primary Charge Code'].apply(determine_type)
+    # Determine Type based on Charge Code (vectorized over the whole column)
+    charge_lower = aggregated['Primary Charge Code'].fillna('').astype(str).str.lower()
+    aggregated['Type'] = np.select(
+        [
+            charge_lower.str.contains('creative'),
+            charge_lower.str.contains('digital|tec', regex=True),
+        ],
+        ['Creative Artwork', 'Digital'],
+        default='Artwork'
+    )
     
     # Set default Core/OAB based on description
     aggregated['Core/OAB'] = 'CORE'
@@ -139,20 +227,30 @@ def process_timesheet(file) -> pd.DataFrame:
 
 def load_template(file) -> Dict:
     """Load and analyze the Excel template"""
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-        tmp_file.write(file.getbuffer())
-        tmp_path = tmp_file.name
-    
-    wb = load_workbook(tmp_path, data_only=False, keep_vba=True)
+    template_bytes = bytes(file.getbuffer())
+    # Memoized on the content hash, so re-uploading the same template is a
+    # cache lookup instead of a full XLSX parse
+    data_hash = hashlib.blake2b(template_bytes, digest_size=16).hexdigest()
+    return _load_template_cached(data_hash, template_bytes)
 
-    # Store formatting information for each sheet
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_template_cached(data_hash: str, _template_bytes: bytes) -> Dict:
+    """Parse the template workbook and capture its formatting."""
+    template_bytes = _template_bytes
+    # Parse straight from the upload buffer; keep the raw bytes around so
+    # the workbook can be re-opened later without touching the filesystem
+    wb = load_workbook(io.BytesIO(template_bytes), data_only=False, keep_vba=True)
+
+    # Store formatting information for the sheets the generator rewrites
     formatting_info = {}
     for sheet_name in wb.sheetnames:
+        if sheet_name not in _SHEET_STYLE_COLS:
+            continue
         sheet = wb[sheet_name]
         sheet_format = {
             'column_widths': {},
             'row_heights': {},
-            'merged_cells': list(sheet.merged_cells.ranges),
+            'merged_cells': [str(r) for r in sheet.merged_cells.ranges],
             'cell_styles': {}
         }
         
@@ -164,30 +262,45 @@ def load_template(file) -> Dict:
         for row in sheet.row_dimensions:
             sheet_format['row_heights'][row] = sheet.row_dimensions[row].height
         
-        # Store cell styles for header rows (first 3 rows)
+        # Store cell styles for the first 3 rows: rows 1-2 are the headers,
+        # and row 3 is the prototype for the data region - generate_invoice
+        # clears rows 3+ and replicates row 3's per-column styles across
+        # every row it writes back. Cells mostly share a handful of template
+        # styles, so copy each distinct style once (keyed by style_id) and
+        # share it between cells instead of cloning Font/Fill/Border/
+        # Alignment per cell - openpyxl dedupes shared style objects again
+        # on save.
+        shared_styles = {}
+        col_limit = _SHEET_STYLE_COLS[sheet_name]
         for row in range(1, 4):
-            for col in range(1, min(sheet.max_column + 1, 50)):
+            for col in range(1, min(sheet.max_column, col_limit) + 1):
                 cell = sheet.cell(row=row, column=col)
-                if cell.value or cell.font or cell.fill or cell.border:
-                    coord = cell.coordinate
-                    sheet_format['cell_styles'][coord] = {
+                if not (cell.value or cell.has_style):
+                    continue
+                style_key = cell.style_id
+                style = shared_styles.get(style_key)
+                if style is None:
+                    style = {
                         'font': cell.font.copy() if cell.font else None,
                         'fill': cell.fill.copy() if cell.fill else None,
                         'border': cell.border.copy() if cell.border else None,
                         'alignment': cell.alignment.copy() if cell.alignment else None,
                         'number_format': cell.number_format
                     }
+                    shared_styles[style_key] = style
+                sheet_format['cell_styles'][cell.coordinate] = style
         
         formatting_info[sheet_name] = sheet_format
     
-    # Extract key information
+    # Extract key information. The parsed workbook itself is not kept:
+    # generate_invoice re-parses from the cached bytes because a loaded
+    # openpyxl workbook cannot be safely deep-copied for mutation.
     template_info = {
-        'path': tmp_path,
+        'bytes': template_bytes,
         'sheets': wb.sheetnames,
         'core_clients': [],
         'oab_clients': [],
         'studio_types': ['Artwork', 'Creative Artwork', 'Digital'],
-        'wb': wb,
         'formatting': formatting_info,
         'has_macros': bool(getattr(wb, 'vba_archive', None)),
     }
@@ -205,30 +318,37 @@ def load_template(file) -> Dict:
             template_info['core_clients'] = clients
         else:
             template_info['oab_clients'] = clients
-    
+
+    wb.close()
     return template_info
 
+def _read_production_file(file) -> pd.DataFrame:
+    """Read a single uploaded production file (header at row 2, index 1)."""
+    file.seek(0)
+    return pd.read_excel(file, header=1, engine=_EXCEL_READ_ENGINE)
+
 def load_production_files(files) -> pd.DataFrame:
     """Load and combine production files, handling deduplication"""
-    all_data = []
-    
-    for file in files:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            tmp_file.write(file.getbuffer())
-            tmp_path = tmp_file.name
-        
-        # Read with header at row 2 (index 1)
-        df = pd.read_excel(tmp_path, header=1)
-        all_data.append(df)
-        os.remove(tmp_path)
-    
+    # Memoized on the content hashes so rerunning the same upload is instant
+    file_hashes = tuple(
+        hashlib.blake2b(file.getbuffer(), digest_size=16).hexdigest()
+        for file in files
+    )
+    return _load_production_files_cached(file_hashes, files)
+
+@st.cache_data(show_spinner=False)
+def _load_production_files_cached(file_hashes: Tuple[str, ...], _files) -> pd.DataFrame:
+    """Read, combine and dedupe the uploaded production files."""
+    # Each upload is independent, so overlap the disk I/O and XML parsing
+    with ThreadPoolExecutor(max_workers=min(8, len(_files))) as executor:
+        all_data = list(executor.map(_read_production_file, _files))
+
     # Combine all dataframes
     combined_df = pd.concat(all_data, ignore_index=True)
-    
+
     # Remove duplicates based on Brief Ref
     combined_df = combined_df.drop_duplicates(subset=['Brief Ref'], keep='first')
-    
+
     return combined_df
 
 def filter_production_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -246,7 +366,9 @@ def filter_production_data(df: pd.DataFrame) -> pd.DataFrame:
 
     if 'Production Supplier Brief Status' in df.columns:
         status_series = df['Production Supplier Brief Status']
-        status_stripped = status_series.apply(lambda x: x.strip() if isinstance(x, str) else x)
+        # An entirely blank status column comes out of read_excel as float64
+        # NaNs, where .str would raise - coerce first (NaN survives the cast)
+        status_stripped = status_series.astype('string').str.strip()
         status_lower = status_stripped.fillna('').str.lower()
 
         df['Production Supplier Brief Status'] = status_stripped
@@ -258,12 +380,28 @@ def filter_production_data(df: pd.DataFrame) -> pd.DataFrame:
     else:
         df['Production Status Note'] = ''
 
+    # Low-cardinality string columns: categorical codes make the later
+    # groupbys, merges and isin lookups integer comparisons instead of
+    # per-row PyObject comparisons
+    for col in ('Project Ref', 'Content Brief Status', 'Production Supplier Brief Status'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
     return df
 
 def prepare_print_data(df: pd.DataFrame) -> pd.DataFrame:
     """Prepare data for the Print tab"""
     # Return the dataframe with all original columns for correct mapping
-    return df.copy()
+    df = df.copy()
+
+    # Coerce the cost columns to float64 once at ingestion, so every later
+    # rerun multiplies contiguous numeric buffers instead of re-parsing
+    # object cells
+    for col in ('Production Sell Price', 'Total including Spares'):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('float64')
+
+    return df
 
 def prepare_studio_data(df: pd.DataFrame) -> pd.DataFrame:
     """Prepare data for the Studio tab - aggregate at job level"""
@@ -274,19 +412,21 @@ def prepare_studio_data(df: pd.DataFrame) -> pd.DataFrame:
         ])
 
     comment_text = 'check all lines are approved, artwork hours may require updating'
-    note_statuses = {'not applicable'}
 
     working_df = df.copy()
 
     if 'Content Brief Status' in working_df.columns:
         status_series = working_df['Content Brief Status']
-        status_stripped = status_series.apply(lambda x: x.strip() if isinstance(x, str) else x)
+        # Coerce before stripping - an all-blank status column arrives as
+        # float64 NaNs, and .str on a float column raises
+        status_stripped = status_series.astype('string').str.strip()
         status_lower = status_stripped.fillna('').str.lower()
         working_df['Content Brief Status'] = status_stripped
-        working_df['__status_lower'] = status_lower
 
-        # Keep only rows that are not exclusively "not applicable" for aggregation
-        valid_rows = working_df[~working_df['__status_lower'].isin(note_statuses)].copy()
+        is_na = status_lower.eq('not applicable')
+
+        # "Not applicable" lines never count towards a job's line total
+        valid_rows = working_df[~is_na]
 
         if valid_rows.empty:
             return pd.DataFrame(columns=[
@@ -294,20 +434,29 @@ def prepare_studio_data(df: pd.DataFrame) -> pd.DataFrame:
                 'Lines', 'Studio Hours', 'Type', 'Core/OAB', 'Studio Comment'
             ])
 
-        grouped = valid_rows.groupby('Project Ref').agg({
+        grouped = valid_rows.groupby('Project Ref', observed=True).agg({
             'Event Name': 'first',
             'Project Description': 'first',
             'Project Owner': 'first',
             'Brief Ref': 'count'  # Count of lines per job
         }).reset_index()
 
-        note_projects = working_df[
-            working_df['__status_lower'].isin(note_statuses)
-        ]['Project Ref'].dropna().unique()
-
-        working_df = working_df.drop(columns=['__status_lower'])
+        # Factorize projects once and count statuses per project with
+        # bincount - one C pass over integer codes, no groupby machinery.
+        # A project with any line not yet completed gets the review note.
+        codes, uniques = pd.factorize(working_df['Project Ref'])
+        observed = codes >= 0  # NaN project refs factorize to -1
+        codes = codes[observed]
+        line_counts = np.bincount(codes, minlength=len(uniques))
+        na_counts = np.bincount(
+            codes, weights=is_na.to_numpy()[observed], minlength=len(uniques))
+        incomplete_counts = np.bincount(
+            codes, weights=status_lower.ne('completed').to_numpy()[observed],
+            minlength=len(uniques))
+        note_mask = (incomplete_counts > 0) & (na_counts < line_counts)
+        note_projects = uniques[note_mask]
     else:
-        grouped = working_df.groupby('Project Ref').agg({
+        grouped = working_df.groupby('Project Ref', observed=True).agg({
             'Event Name': 'first',
             'Project Description': 'first',
             'Project Owner': 'first',
@@ -359,151 +508,196 @@ def apply_formatting(sheet, formatting_info):
         except:
             pass  # Skip if cell doesn't exist
     
-    # Restore merged cells
-    for merged_range in formatting_info.get('merged_cells', []):
-        try:
-            sheet.merge_cells(str(merged_range))
-        except:
-            pass  # Skip if merge fails
+    # Restore merged cells (stored as range strings; skip ranges that are
+    # already merged rather than re-merging them)
+    saved_ranges = formatting_info.get('merged_cells', [])
+    if saved_ranges:
+        existing = {str(r) for r in sheet.merged_cells.ranges}
+        for merged_range in saved_ranges:
+            if merged_range in existing:
+                continue
+            try:
+                sheet.merge_cells(merged_range)
+            except:
+                pass  # Skip if merge fails
 
 def generate_invoice(template_info: Dict, studio_df: pd.DataFrame, print_df: pd.DataFrame,
-                     event_name: str, event_code: str) -> Tuple[str, str, str]:
+                     event_name: str, event_code: str) -> Tuple[bytes, str, str]:
     """Generate the invoice Excel file with proper formatting.
 
-    Returns a tuple of (output_path, download_filename, mime_type).
+    Returns a tuple of (excel_bytes, download_filename, mime_type).
     """
     
-    # Load the template
-    wb = load_workbook(template_info['path'], data_only=False, keep_vba=True)
+    # Each generation parses a fresh workbook from the cached upload bytes.
+    # Reusing the workbook load_template parsed is not an option: deep-
+    # copying a loaded openpyxl workbook silently corrupts its style tables
+    # on save (and keep_vba archives cannot be deep-copied at all). The
+    # bytes come straight from the template cache, so the re-parse at least
+    # never touches disk or the upload widget.
+    template_bytes = template_info.get('bytes')
+    if template_bytes is not None:
+        wb = load_workbook(io.BytesIO(template_bytes), data_only=False, keep_vba=True)
+    else:
+        wb = load_workbook(template_info['path'], data_only=False, keep_vba=True)
     
     # Update Event Summary sheets with event name
     for sheet_name in ['Event Summary - Core', 'Event Summary - OAB']:
         if sheet_name in wb.sheetnames:
             sheet = wb[sheet_name]
+            # Writing a value never disturbs the cell's style, so no
+            # formatting re-application is needed here
             sheet['D4'] = event_name
-            
-            # Preserve formatting
-            if sheet_name in template_info['formatting']:
-                apply_formatting(sheet, template_info['formatting'][sheet_name])
     
     # Populate Studio sheet
     if 'Studio' in wb.sheetnames and not studio_df.empty:
         sheet = wb['Studio']
+
+        # Clear existing data in one shot (keep headers in row 2)
+        if sheet.max_row >= 3:
+            sheet.delete_rows(3, sheet.max_row - 2)
         
-        # Preserve formatting first
-        if 'Studio' in template_info['formatting']:
-            apply_formatting(sheet, template_info['formatting']['Studio'])
-        
-        # Clear existing data (keep headers in row 2)
-        for row in range(3, min(sheet.max_row + 1, 1000)):
-            for col in range(1, 15):
-                cell = sheet.cell(row=row, column=col)
-                cell.value = None
-        
-        # Add studio data
-        for idx, (_, job) in enumerate(studio_df.iterrows(), start=3):
-            sheet[f'A{idx}'] = job['Project Ref']
-            sheet[f'B{idx}'] = job['Event Name']
-            sheet[f'C{idx}'] = job['Project Description']
-            sheet[f'D{idx}'] = job['Project Owner']
-            sheet[f'E{idx}'] = job['Lines']
-
-            # Add hours and type if available
-            if pd.notna(job.get('Studio Hours')):
-                sheet[f'F{idx}'] = job['Studio Hours']
-            if job.get('Type'):
-                sheet[f'G{idx}'] = job['Type']
-
-            # Formula for rate
-            sheet[f'H{idx}'] = f'=IF(G{idx}="Artwork",49.5,IF(G{idx}="Creative Artwork",57,IF(G{idx}="Digital",49.5,0)))'
-
-            # Formula for cost
-            sheet[f'I{idx}'] = f'=F{idx}*H{idx}'
-
-            # Core/OAB if available
-            if job.get('Core/OAB'):
-                sheet[f'J{idx}'] = job['Core/OAB']
-
-            # Add studio comment if applicable
-            comment_value = job.get('Studio Comment', '')
-            if pd.notna(comment_value):
-                comment_text = str(comment_value).strip()
-                if comment_text:
-                    sheet[f'A{idx}'].comment = Comment(comment_text, "Status")
+        # Add studio data via integer-indexed cell writes (avoids per-cell
+        # coordinate string parsing in the hot loop)
+        studio_cols = [
+            'Project Ref', 'Event Name', 'Project Description', 'Project Owner',
+            'Lines', 'Studio Hours', 'Type', 'Core/OAB', 'Studio Comment'
+        ]
+        studio_block = studio_df.reindex(columns=studio_cols)
+
+        # Rate and cost formulas pre-built outside the write loop
+        studio_rows = range(3, 3 + len(studio_block))
+        studio_block['Rate Formula'] = [
+            f'=IF(G{r}="Artwork",49.5,IF(G{r}="Creative Artwork",57,IF(G{r}="Digital",49.5,0)))'
+            for r in studio_rows
+        ]
+        studio_block['Cost Formula'] = [f'=F{r}*H{r}' for r in studio_rows]
+
+        # delete_rows above left max_row at 2, so append lands at row 3 -
+        # matching the row numbers baked into the formulas. One append per
+        # row replaces ten cell() calls; None leaves a cell empty.
+        for row in studio_block.itertuples(index=False, name=None):
+            (project_ref, event, description, owner, lines, hours,
+             job_type, core_oab, _, rate_formula, cost_formula) = row
+            sheet.append([
+                project_ref, event, description, owner, lines,
+                hours if pd.notna(hours) else None,
+                job_type or None,
+                rate_formula, cost_formula,
+                core_oab or None,
+            ])
+
+        # Attach studio comments in a second pass over only the flagged rows,
+        # keeping Comment construction out of the row-write loop
+        studio_comments = studio_block['Studio Comment'].fillna('').astype(str).str.strip()
+        for pos in studio_comments.ne('').to_numpy().nonzero()[0]:
+            sheet.cell(row=int(pos) + 3, column=1).comment = Comment(studio_comments.iat[pos], "Status")
+
+        # delete_rows stripped the template's styling from the whole data
+        # region, not just row 3. Row 3 carries the per-column data styling
+        # (number formats, fills, borders), so replicate its captured styles
+        # across every written row. Styles are only captured for rows 1-3,
+        # so the suffix test selects row 3 alone; the style dicts are shared,
+        # not copied, per cell.
+        studio_fmt = template_info['formatting'].get('Studio', {})
+        row3_styles = {
+            coord: style
+            for coord, style in studio_fmt.get('cell_styles', {}).items()
+            if coord.endswith('3')
+        }
+        if row3_styles:
+            data_styles = {
+                f'{coord[:-1]}{row}': style
+                for coord, style in row3_styles.items()
+                for row in studio_rows
+            }
+            apply_formatting(sheet, {'cell_styles': data_styles})
     
     # Populate Print sheet
     if 'Print' in wb.sheetnames and not print_df.empty:
         sheet = wb['Print']
+
+        # Clear existing data in one shot (keep headers in row 2)
+        if sheet.max_row >= 3:
+            sheet.delete_rows(3, sheet.max_row - 2)
         
-        # Preserve formatting first
-        if 'Print' in template_info['formatting']:
-            apply_formatting(sheet, template_info['formatting']['Print'])
-        
-        # Clear existing data (keep headers in row 2)
-        for row in range(3, min(sheet.max_row + 1, 3000)):
-            for col in range(1, 30):  # Up to column AC
-                cell = sheet.cell(row=row, column=col)
-                cell.value = None
-        
-        # Add print data with CORRECT field mappings
-        for idx, (_, item) in enumerate(print_df.iterrows(), start=3):
+        # Add print data with CORRECT field mappings, written as whole rows
+        # via integer-indexed cells rather than per-cell string coordinates
+        print_cols = [
             # Columns A-K: Basic information
-            sheet[f'A{idx}'] = item.get('Project Ref', '')
-            sheet[f'B{idx}'] = item.get('Event Name', '')
-            sheet[f'C{idx}'] = item.get('Project Description', '')
-            sheet[f'D{idx}'] = item.get('Project Owner', '')
-            sheet[f'E{idx}'] = item.get('Brief Ref', '')
-            sheet[f'F{idx}'] = item.get('POS Code', '')
-            sheet[f'G{idx}'] = item.get('Brief Description', '')
-            sheet[f'H{idx}'] = str(item.get('Part URN', ''))
-            sheet[f'I{idx}'] = item.get('Part', '')
-            sheet[f'J{idx}'] = item.get('Height', 0)
-            sheet[f'K{idx}'] = item.get('Width', 0)
-            
+            ('Project Ref', ''), ('Event Name', ''), ('Project Description', ''),
+            ('Project Owner', ''), ('Brief Ref', ''), ('POS Code', ''),
+            ('Brief Description', ''), ('Part URN', ''), ('Part', ''),
+            ('Height', 0), ('Width', 0),
             # Columns L-S: Production details
-            sheet[f'L{idx}'] = item.get('Colours Front', '')
-            sheet[f'M{idx}'] = item.get('Colours Back', '')
-            sheet[f'N{idx}'] = item.get('Material', '')
-            sheet[f'O{idx}'] = item.get('No of Pages', 0)  # No of Pages from input
-            sheet[f'P{idx}'] = item.get('Production Finishing Notes', '')
-            sheet[f'Q{idx}'] = item.get('Production Supplier Comments', '')
-            sheet[f'R{idx}'] = item.get('Allocated Qty', 0)
-            sheet[f'S{idx}'] = item.get('Spares', 0)
-            
+            ('Colours Front', ''), ('Colours Back', ''), ('Material', ''),
+            ('No of Pages', 0), ('Production Finishing Notes', ''),
+            ('Production Supplier Comments', ''), ('Allocated Qty', 0), ('Spares', 0),
             # Columns T-Y: Status and costs
-            sheet[f'T{idx}'] = item.get('Total including Spares', 0)  # Total including Spares
-            sheet[f'U{idx}'] = item.get('No of Stores', 0)  # No of Stores
-            sheet[f'V{idx}'] = str(item.get('In Store Deadline', ''))  # In Store Deadline
-            sheet[f'W{idx}'] = item.get('Content Brief Status', '')  # Content Brief Status
-            sheet[f'X{idx}'] = item.get('Production Supplier Brief Status', '')  # Production Supplier Brief Status
-            sheet[f'Y{idx}'] = item.get('Production Sell Price', 0)  # Production Cost (from Sell Price)
-
-            # Add production status comment when flagged
-            status_note = item.get('Production Status Note', '')
-            if pd.notna(status_note):
-                status_note_text = str(status_note).strip()
-                if status_note_text:
-                    sheet[f'X{idx}'].comment = Comment(status_note_text, "Status")
-            
-            # Column Z: Core/OAB lookup formula
-            sheet[f'Z{idx}'] = f'=IF(Y{idx}>0,IFERROR(VLOOKUP(A{idx},Studio!$A$3:$J$6129,10,FALSE),""),"")' 
-            
-            # Column AA: Comments if exists
-            if 'Comments' in item:
-                sheet[f'AA{idx}'] = item.get('Comments', '')
-    
-    # Preserve formatting for all other sheets
-    for sheet_name in wb.sheetnames:
-        if sheet_name not in ['Studio', 'Print', 'Event Summary - Core', 'Event Summary - OAB']:
-            if sheet_name in template_info['formatting']:
-                sheet = wb[sheet_name]
-                apply_formatting(sheet, template_info['formatting'][sheet_name])
+            ('Total including Spares', 0), ('No of Stores', 0), ('In Store Deadline', ''),
+            ('Content Brief Status', ''), ('Production Supplier Brief Status', ''),
+            ('Production Sell Price', 0),
+        ]
+        print_block = pd.DataFrame(index=print_df.index)
+        for col_name, default in print_cols:
+            print_block[col_name] = print_df[col_name] if col_name in print_df.columns else default
+        print_block['Part URN'] = print_block['Part URN'].astype(str)
+        print_block['In Store Deadline'] = print_block['In Store Deadline'].astype(str)
+
+        status_notes = (
+            print_df['Production Status Note']
+            if 'Production Status Note' in print_df.columns else None
+        )
+
+        # Column Z: Core/OAB lookup formulas, pre-built as a column so the
+        # write loop below is one uniform pass over whole rows
+        row_numbers = range(3, 3 + len(print_block))
+        print_block['Core/OAB Lookup'] = [
+            f'=IF(Y{r}>0,IFERROR(VLOOKUP(A{r},Studio!$A$3:$J$6129,10,FALSE),""),"")'
+            for r in row_numbers
+        ]
+
+        # Column AA: Comments if the upload provides them
+        if 'Comments' in print_df.columns:
+            print_block['Comments'] = print_df['Comments']
+
+        # As on the Studio sheet, append picks up at row 3 after delete_rows,
+        # replacing 26 cell() calls per row with a single batched write
+        for values in print_block.itertuples(index=False, name=None):
+            sheet.append(values)
+
+        # Add production status comments in a second pass over only the
+        # flagged rows - comments are rare, so keep them out of the hot loop
+        if status_notes is not None:
+            note_texts = status_notes.fillna('').astype(str).str.strip()
+            for pos in note_texts.ne('').to_numpy().nonzero()[0]:
+                sheet.cell(row=int(pos) + 3, column=24).comment = Comment(note_texts.iat[pos], "Status")
+
+        # As on the Studio sheet, replicate the captured row-3 column styles
+        # across every written row - delete_rows removed them from the whole
+        # cleared region
+        print_fmt = template_info['formatting'].get('Print', {})
+        row3_styles = {
+            coord: style
+            for coord, style in print_fmt.get('cell_styles', {}).items()
+            if coord.endswith('3')
+        }
+        if row3_styles:
+            data_styles = {
+                f'{coord[:-1]}{row}': style
+                for coord, style in row3_styles.items()
+                for row in row_numbers
+            }
+            apply_formatting(sheet, {'cell_styles': data_styles})
     
-    # Save the file with event code in filename
+    # Sheets the generator never touches keep their formatting for free -
+    # no re-application pass needed
+
+    # Save straight into memory - the caller feeds the bytes to the
+    # download button, so a temp-file round trip buys nothing
     now = datetime.now()
     extension = '.xlsm' if template_info.get('has_macros') else '.xlsx'
-    output_path = f"/tmp/{event_code}_Superdrug_ITG_Invoice_{now.strftime('%Y%m%d_%H%M%S')}{extension}"
-    wb.save(output_path)
+    buffer = io.BytesIO()
+    wb.save(buffer)
     wb.close()
 
     download_filename = f"{event_code}_Superdrug_ITG_Invoice_{now.strftime('%Y%m%d')}{extension}"
@@ -513,7 +707,73 @@ def generate_invoice(template_info: Dict, studio_df: pd.DataFrame, print_df: pd.
         else 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
 
-    return output_path, download_filename, mime_type
+    return buffer.getvalue(), download_filename, mime_type
+
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: lambda d: pd.util.hash_pandas_object(d, index=True).values.tobytes()},
+)
+def _compute_costs(studio_df: pd.DataFrame, print_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, Dict]:
+    """Derive per-row studio/print costs and the Core vs OAB totals.
+
+    Cached on the content of both frames so Streamlit reruns triggered by
+    unrelated widgets skip the pandas work entirely.
+    """
+    # Studio costs: index a small rate lookup table by integer type codes
+    # and multiply against the hours buffer - no per-row dict lookups
+    rate_index = pd.Index(['Artwork', 'Creative Artwork', 'Digital'])
+    rates = np.array([49.5, 57.0, 49.5, 49.5])  # final slot is the fallback
+    codes = rate_index.get_indexer(studio_df['Type'])  # unknown types code to -1
+    rate_values = rates[codes]
+    hours = pd.to_numeric(studio_df['Studio Hours'], errors='coerce').to_numpy(dtype='float64', na_value=0.0)
+
+    # Derive onto a slim column subset rather than deep-copying the whole
+    # session frame; the derived columns are new, so the source is untouched
+    studio_costs = studio_df[['Project Ref', 'Project Description', 'Lines',
+                              'Studio Hours', 'Core/OAB']].copy()
+    studio_costs['Rate'] = rate_values
+    studio_costs['Studio Cost'] = rate_values * hours
+
+    # Assign Core/OAB to print items based on studio data - a vectorized
+    # hash join instead of a Python dict lookup per print row. The merge
+    # already materializes a fresh frame, so no up-front copy is needed.
+    print_costs = print_df.drop(columns=['Core/OAB'], errors='ignore').merge(
+        studio_costs[['Project Ref', 'Core/OAB']].drop_duplicates('Project Ref'),
+        on='Project Ref', how='left', validate='m:1'
+    )
+    print_costs['Core/OAB'] = print_costs['Core/OAB'].fillna('CORE')
+
+    # Print costs - using only Production Sell Price. The cost columns are
+    # coerced to float64 at ingestion, so this is one numpy multiply.
+    print_costs['Total Cost'] = (
+        print_costs['Production Sell Price'].to_numpy(dtype='float64', na_value=0.0)
+        * print_costs['Total including Spares'].to_numpy(dtype='float64', na_value=0.0)
+    )
+
+    # Calculate totals - one grouped pass per frame rather than a boolean
+    # mask and reduction per category
+    studio_by_group = studio_costs.groupby('Core/OAB', sort=False, observed=True)['Studio Cost'].sum()
+    print_by_group = print_costs.groupby('Core/OAB', sort=False, observed=True)['Total Cost'].sum()
+    totals = {
+        'studio_core': studio_by_group.get('CORE', 0.0),
+        'studio_oab': studio_by_group.get('OAB', 0.0),
+        'print_core': print_by_group.get('CORE', 0.0),
+        'print_oab': print_by_group.get('OAB', 0.0),
+    }
+
+    return studio_costs, print_costs, totals
+
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={pd.DataFrame: lambda d: pd.util.hash_pandas_object(d, index=True).values.tobytes()},
+)
+def _to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize a frame for download, memoized on its contents.
+
+    Reruns from unrelated widgets pay a hash lookup instead of a full
+    CSV re-encode of the session data.
+    """
+    return df.to_csv(index=False).encode('utf-8')
 
 # Main UI
 st.title("📊 Superdrug ITG Invoice Generator v3.0")
@@ -673,8 +933,8 @@ if st.session_state.template_loaded:
                             
                             # Update with timesheet data where available
                             merged['Studio Hours'] = merged['Total Hours'].fillna(merged['Studio Hours'])
-                            merged['Type'] = merged['Type_timesheet'].fillna(merged['Type']).replace('', 'Artwork')
-                            merged['Core/OAB'] = merged['Core/OAB_timesheet'].fillna(merged['Core/OAB']).replace('', 'CORE')
+                            merged['Type'] = merged['Type_timesheet'].fillna(merged['Type']).replace('', 'Artwork').astype(_TYPE_DTYPE)
+                            merged['Core/OAB'] = merged['Core/OAB_timesheet'].fillna(merged['Core/OAB']).replace('', 'CORE').astype(_CORE_OAB_DTYPE)
                             
                             # Drop timesheet columns
                             merged = merged.drop(['Total Hours', 'Type_timesheet', 'Core/OAB_timesheet'], axis=1, errors='ignore')
@@ -718,43 +978,19 @@ if st.session_state.template_loaded:
             # Editable dataframe
             edit_df = st.session_state.studio_data.copy()
             edit_df['Studio Hours'] = edit_df['Studio Hours'].fillna(0.0)
-            edit_df['Type'] = edit_df['Type'].replace('', 'Artwork')
-            edit_df['Core/OAB'] = edit_df['Core/OAB'].replace('', 'CORE')
+            # Resolve the empty-string placeholders, then carry the columns
+            # as categoricals through the editor and session state
+            edit_df['Type'] = edit_df['Type'].replace('', 'Artwork').astype(_TYPE_DTYPE)
+            edit_df['Core/OAB'] = edit_df['Core/OAB'].replace('', 'CORE').astype(_CORE_OAB_DTYPE)
             if 'Studio Comment' not in edit_df.columns:
                 edit_df['Studio Comment'] = ''
             edit_df['Studio Comment'] = edit_df['Studio Comment'].fillna('')
 
-            # Create editable columns configuration
-            column_config = {
-                "Project Ref": st.column_config.TextColumn("Project Ref", disabled=True),
-                "Event Name": st.column_config.TextColumn("Event Name", disabled=True),
-                "Project Description": st.column_config.TextColumn("Description", disabled=True),
-                "Project Owner": st.column_config.TextColumn("Owner", disabled=True),
-                "Lines": st.column_config.NumberColumn("Lines", disabled=True, format="%d"),
-                "Studio Hours": st.column_config.NumberColumn("Hours", min_value=0, max_value=1000, step=0.25, required=True),
-                "Type": st.column_config.SelectboxColumn(
-                    "Type",
-                    options=["Artwork", "Creative Artwork", "Digital"],
-                    default="Artwork",
-                    required=True
-                ),
-                "Core/OAB": st.column_config.SelectboxColumn(
-                    "Core/OAB",
-                    options=["CORE", "OAB"],
-                    default="CORE",
-                    required=True
-                )
-            }
-
-            if 'Studio Comment' in edit_df.columns:
-                column_config["Studio Comment"] = st.column_config.TextColumn(
-                    "Note",
-                    disabled=True
-                )
-            
             edited_studio = st.data_editor(
                 edit_df,
-                column_config=column_config,
+                # Column objects are allocated once at import; the Studio
+                # Comment column is always ensured on edit_df above
+                column_config=_STUDIO_COLUMN_CONFIG,
                 use_container_width=True,
                 num_rows="fixed",
                 height=400
@@ -763,20 +999,23 @@ if st.session_state.template_loaded:
             # Update session state with edited data
             st.session_state.studio_data = edited_studio
             
-            # Show summary
-            if edited_studio['Studio Hours'].sum() > 0:
+            # Show summary - one read of the hours buffer plus one grouped
+            # pass covers all four metrics and the display gate
+            hrs = edited_studio['Studio Hours'].to_numpy(dtype=np.float64, na_value=0.0)
+            total_hours = float(hrs.sum())
+            if total_hours > 0:
+                hours_by_group = edited_studio.groupby('Core/OAB', sort=False, observed=True)['Studio Hours'].sum()
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    total_hours = edited_studio['Studio Hours'].sum()
                     st.metric("Total Hours", f"{total_hours:.2f}")
                 with col2:
-                    core_hours = edited_studio[edited_studio['Core/OAB'] == 'CORE']['Studio Hours'].sum()
+                    core_hours = hours_by_group.get('CORE', 0.0)
                     st.metric("Core Hours", f"{core_hours:.2f}")
                 with col3:
-                    oab_hours = edited_studio[edited_studio['Core/OAB'] == 'OAB']['Studio Hours'].sum()
+                    oab_hours = hours_by_group.get('OAB', 0.0)
                     st.metric("OAB Hours", f"{oab_hours:.2f}")
                 with col4:
-                    projects_with_hours = (edited_studio['Studio Hours'] > 0).sum()
+                    projects_with_hours = int((hrs > 0).sum())
                     st.metric("Projects with Hours", projects_with_hours)
         else:
             st.info("Please process Production Files first to load project data")
@@ -788,11 +1027,10 @@ if st.session_state.template_loaded:
             st.subheader("Studio Data Preview")
             st.dataframe(st.session_state.studio_data, use_container_width=True)
             
-            # Download button for studio data
-            csv = st.session_state.studio_data.to_csv(index=False)
+            # Download button for studio data (serialization is memoized)
             st.download_button(
                 "📥 Download Studio Data (CSV)",
-                csv,
+                _to_csv_bytes(st.session_state.studio_data),
                 f"studio_data_{event_code}.csv",
                 "text/csv",
                 key='download-studio'
@@ -802,11 +1040,10 @@ if st.session_state.template_loaded:
             st.subheader("Print Data Preview (first 100 rows)")
             st.dataframe(st.session_state.print_data.head(100), use_container_width=True)
             
-            # Download button for print data
-            csv = st.session_state.print_data.to_csv(index=False)
+            # Download button for print data (serialization is memoized)
             st.download_button(
                 "📥 Download Print Data (CSV)",
-                csv,
+                _to_csv_bytes(st.session_state.print_data),
                 f"print_data_{event_code}.csv",
                 "text/csv",
                 key='download-print'
@@ -816,33 +1053,21 @@ if st.session_state.template_loaded:
         st.header("💰 Cost Preview")
         
         if not st.session_state.studio_data.empty and not st.session_state.print_data.empty:
-            # Calculate costs
-            studio_df = st.session_state.studio_data.copy()
-            print_df = st.session_state.print_data.copy()
-            
             # Check if studio hours have been entered
-            if studio_df['Studio Hours'].notna().any() and studio_df['Studio Hours'].sum() > 0:
-                # Studio costs
-                rate_map = {'Artwork': 49.5, 'Creative Artwork': 57, 'Digital': 49.5}
-                studio_df['Rate'] = studio_df['Type'].map(rate_map).fillna(49.5)
-                studio_df['Studio Cost'] = pd.to_numeric(studio_df['Studio Hours'], errors='coerce').fillna(0) * studio_df['Rate']
-                
-                # Print costs - using only Production Sell Price
-                print_df['Production Sell Price'] = pd.to_numeric(print_df['Production Sell Price'], errors='coerce').fillna(0)
-                print_df['Total including Spares'] = pd.to_numeric(print_df['Total including Spares'], errors='coerce').fillna(0)
-                print_df['Total Cost'] = print_df['Production Sell Price'] * print_df['Total including Spares']
-                
-                # Assign Core/OAB to print items based on studio data
-                project_core_oab = studio_df.set_index('Project Ref')['Core/OAB'].to_dict()
-                print_df['Core/OAB'] = print_df['Project Ref'].map(project_core_oab).fillna('CORE')
-                
-                # Calculate totals
-                studio_core = studio_df[studio_df['Core/OAB'] == 'CORE']['Studio Cost'].sum()
-                studio_oab = studio_df[studio_df['Core/OAB'] == 'OAB']['Studio Cost'].sum()
-                
-                print_core = print_df[print_df['Core/OAB'] == 'CORE']['Total Cost'].sum()
-                print_oab = print_df[print_df['Core/OAB'] == 'OAB']['Total Cost'].sum()
-                
+            # One reduction over the raw hours buffer decides whether the
+            # whole cost-preview path is worth running
+            hrs = st.session_state.studio_data['Studio Hours'].to_numpy(dtype=np.float64, na_value=0.0)
+            if hrs.size and hrs.max() > 0.0:
+                # Calculate costs (memoized on the frame contents)
+                studio_df, print_df, totals = _compute_costs(
+                    st.session_state.studio_data,
+                    st.session_state.print_data
+                )
+                studio_core = totals['studio_core']
+                studio_oab = totals['studio_oab']
+                print_core = totals['print_core']
+                print_oab = totals['print_oab']
+
                 # Display summary
                 col1, col2 = st.columns(2)
                 
@@ -866,26 +1091,39 @@ if st.session_state.template_loaded:
                 
                 # Breakdown by project
                 with st.expander("📊 Breakdown by Project"):
-                    project_summary = studio_df[['Project Ref', 'Project Description', 'Lines', 
+                    project_summary = studio_df[['Project Ref', 'Project Description', 'Lines',
                                                 'Studio Hours', 'Studio Cost', 'Core/OAB']].copy()
-                    
-                    # Add production costs per project
-                    print_by_project = print_df.groupby('Project Ref')['Total Cost'].sum().reset_index()
-                    print_by_project.columns = ['Project Ref', 'Production Cost']
-                    
-                    project_summary = project_summary.merge(print_by_project, on='Project Ref', how='left')
-                    project_summary['Production Cost'] = project_summary['Production Cost'].fillna(0)
-                    project_summary['Total Cost'] = project_summary['Studio Cost'] + project_summary['Production Cost']
-                    
-                    st.dataframe(
-                        project_summary.style.format({
-                            'Studio Cost': '£{:,.2f}',
-                            'Production Cost': '£{:,.2f}',
-                            'Total Cost': '£{:,.2f}',
-                            'Studio Hours': '{:.2f}'
-                        }),
-                        use_container_width=True
+
+                    # Add production costs per project - the grouped sums are
+                    # unique per ref, so an aligned map beats a full merge
+                    print_by_project = print_df.groupby('Project Ref', sort=False, observed=True)['Total Cost'].sum()
+                    project_summary['Production Cost'] = (
+                        project_summary['Project Ref'].map(print_by_project).fillna(0.0)
+                    )
+                    project_summary['Total Cost'] = (
+                        project_summary['Studio Cost'].to_numpy()
+                        + project_summary['Production Cost'].to_numpy()
                     )
+                    
+                    summary_formats = {
+                        'Studio Cost': '£{:,.2f}',
+                        'Production Cost': '£{:,.2f}',
+                        'Total Cost': '£{:,.2f}',
+                        'Studio Hours': '{:.2f}',
+                    }
+                    if len(project_summary) > 200:
+                        # Styler formats cell-by-cell at serialization time,
+                        # which dominates render latency on big breakdowns -
+                        # pre-format the display copy into strings instead
+                        display_summary = project_summary.copy()
+                        for col, fmt in summary_formats.items():
+                            display_summary[col] = display_summary[col].map(fmt.format)
+                        st.dataframe(display_summary, use_container_width=True)
+                    else:
+                        st.dataframe(
+                            project_summary.style.format(summary_formats),
+                            use_container_width=True
+                        )
             else:
                 st.warning("⚠️ Please enter Studio Hours in the Studio Hours Review tab to see cost preview")
         else:
@@ -919,7 +1157,7 @@ if st.session_state.template_loaded:
             if st.button("🚀 Generate Invoice", type="primary", use_container_width=True):
                 with st.spinner("Generating invoice with formatting..."):
                     try:
-                        output_file, download_name, mime_type = generate_invoice(
+                        excel_data, download_name, mime_type = generate_invoice(
                             st.session_state.template_info,
                             st.session_state.studio_data,
                             st.session_state.print_data,
@@ -927,13 +1165,9 @@ if st.session_state.template_loaded:
                             event_code
                         )
 
-                        st.session_state.generated_file = output_file
+                        st.session_state.generated_file = excel_data
                         st.success(f"✅ Invoice generated successfully!")
 
-                        # Provide download button
-                        with open(output_file, 'rb') as f:
-                            excel_data = f.read()
-
                         st.download_button(
                             label="📥 Download Invoice",
                             data=excel_data,
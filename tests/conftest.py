@@ -0,0 +1,47 @@
+"""Shared helpers for loading pieces of invoice_app_v3.py into tests.
+
+The test modules exec individual functions from the app source instead of
+importing the whole Streamlit script. Reading, parsing and compiling the
+source is memoized here so each test pays only for a fresh exec into its
+own namespace.
+"""
+
+import ast
+from functools import lru_cache
+from pathlib import Path
+
+MODULE_PATH = Path(__file__).resolve().parents[1] / "invoice_app_v3.py"
+
+
+@lru_cache(maxsize=None)
+def module_source() -> str:
+    return MODULE_PATH.read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=None)
+def module_ast() -> ast.Module:
+    return ast.parse(module_source(), filename=str(MODULE_PATH))
+
+
+@lru_cache(maxsize=None)
+def compiled_snippet(func_names, assign_names=()):
+    """Compile the named top-level functions (and assignments) once.
+
+    Returns a code object ready to exec into a per-test namespace.
+    """
+    selected_nodes = [
+        node
+        for node in module_ast().body
+        if (
+            isinstance(node, ast.FunctionDef)
+            and node.name in set(func_names)
+        )
+        or (
+            isinstance(node, ast.Assign)
+            and any(
+                isinstance(target, ast.Name) and target.id in set(assign_names)
+                for target in node.targets
+            )
+        )
+    ]
+    return compile(ast.Module(body=selected_nodes, type_ignores=[]), str(MODULE_PATH), "exec")
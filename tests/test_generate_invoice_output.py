@@ -1,39 +1,29 @@
-import ast
+import io
 from datetime import datetime
-from pathlib import Path
 
 import pandas as pd
 from typing import Dict, Tuple
 
+import conftest
+
 
 class _StubWorkbook:
     def __init__(self):
         self.sheetnames = []
-        self.saved_paths = []
+        self.saved_targets = []
         self.closed = False
 
-    def save(self, path):
-        self.saved_paths.append(path)
+    def save(self, target):
+        target.write(b"stub-bytes")
+        self.saved_targets.append(target)
 
     def close(self):
         self.closed = True
 
 
 def _load_generate_invoice():
-    module_path = Path(__file__).resolve().parents[1] / "invoice_app_v3.py"
-    source = module_path.read_text(encoding="utf-8")
-    module_ast = ast.parse(source, filename=str(module_path))
-
-    selected_nodes = [
-        node
-        for node in module_ast.body
-        if isinstance(node, ast.FunctionDef)
-        and node.name in {"generate_invoice"}
-    ]
-
-    compiled = compile(ast.Module(body=selected_nodes, type_ignores=[]), str(module_path), "exec")
-
-    namespace = {"pd": pd, "datetime": datetime, "Dict": Dict, "Tuple": Tuple}
+    compiled = conftest.compiled_snippet(("generate_invoice",))
+    namespace = {"pd": pd, "datetime": datetime, "Dict": Dict, "Tuple": Tuple, "io": io}
     exec(compiled, namespace)
     return namespace["generate_invoice"]
 
@@ -55,7 +45,7 @@ def test_generate_invoice_uses_xlsm_extension_for_macro_templates(tmp_path):
         "has_macros": True,
     }
 
-    path, download_name, mime_type = generate_invoice(
+    excel_bytes, download_name, mime_type = generate_invoice(
         template_info,
         pd.DataFrame(),
         pd.DataFrame(),
@@ -63,8 +53,8 @@ def test_generate_invoice_uses_xlsm_extension_for_macro_templates(tmp_path):
         "E0000",
     )
 
-    assert path.endswith(".xlsm")
-    assert stub_wb.saved_paths == [path]
+    assert excel_bytes == b"stub-bytes"
+    assert len(stub_wb.saved_targets) == 1
     assert download_name.endswith(".xlsm")
     assert mime_type == "application/vnd.ms-excel.sheet.macroEnabled.12"
 
@@ -86,7 +76,7 @@ def test_generate_invoice_uses_xlsx_extension_when_no_macros(tmp_path):
         "has_macros": False,
     }
 
-    path, download_name, mime_type = generate_invoice(
+    excel_bytes, download_name, mime_type = generate_invoice(
         template_info,
         pd.DataFrame(),
         pd.DataFrame(),
@@ -94,8 +84,8 @@ def test_generate_invoice_uses_xlsx_extension_when_no_macros(tmp_path):
         "E0000",
     )
 
-    assert path.endswith(".xlsx")
-    assert stub_wb.saved_paths == [path]
+    assert excel_bytes == b"stub-bytes"
+    assert len(stub_wb.saved_targets) == 1
     assert download_name.endswith(".xlsx")
     assert mime_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
@@ -120,6 +110,17 @@ def test_generate_invoice_adds_comments_to_studio_sheet(tmp_path):
             self.cells = {}
             self.max_row = 10
             self.max_column = 10
+            self.deleted_rows = []
+
+        def delete_rows(self, idx, amount=1):
+            self.deleted_rows.append((idx, amount))
+            self.max_row = max(idx - 1, 1)
+
+        def append(self, values):
+            self.max_row += 1
+            for column, value in enumerate(values, start=1):
+                if value is not None:
+                    self.cell(self.max_row, column, value)
 
         def _ensure_cell(self, coord):
             if coord not in self.cells:
@@ -132,15 +133,18 @@ def test_generate_invoice_adds_comments_to_studio_sheet(tmp_path):
         def __setitem__(self, coord, value):
             self._ensure_cell(coord).value = value
 
-        def cell(self, row, column):
+        def cell(self, row, column, value=None):
             coord = f"{_column_letter(column)}{row}"
-            return self._ensure_cell(coord)
+            cell = self._ensure_cell(coord)
+            if value is not None:
+                cell.value = value
+            return cell
 
     class _WorkbookWithStudio:
         def __init__(self):
             self.sheetnames = ['Studio']
             self.studio = _Sheet()
-            self.saved_paths = []
+            self.saved_targets = []
             self.closed = False
 
         def __getitem__(self, name):
@@ -148,8 +152,9 @@ def test_generate_invoice_adds_comments_to_studio_sheet(tmp_path):
                 return self.studio
             raise KeyError(name)
 
-        def save(self, path):
-            self.saved_paths.append(path)
+        def save(self, target):
+            target.write(b"stub-bytes")
+            self.saved_targets.append(target)
 
         def close(self):
             self.closed = True
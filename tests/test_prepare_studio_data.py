@@ -1,23 +1,12 @@
-import ast
-from pathlib import Path
-
+import numpy as np
 import pandas as pd
 
+import conftest
 
-def _load_prepare_studio_data():
-    module_path = Path(__file__).resolve().parents[1] / "invoice_app_v3.py"
-    source = module_path.read_text(encoding="utf-8")
-    module_ast = ast.parse(source, filename=str(module_path))
-
-    selected_nodes = [
-        node
-        for node in module_ast.body
-        if isinstance(node, ast.FunctionDef)
-        and node.name in {"prepare_studio_data"}
-    ]
 
-    compiled = compile(ast.Module(body=selected_nodes, type_ignores=[]), str(module_path), "exec")
-    namespace = {"pd": pd}
+def _load_prepare_studio_data():
+    compiled = conftest.compiled_snippet(("prepare_studio_data",))
+    namespace = {"np": np, "pd": pd}
     exec(compiled, namespace)
     return namespace["prepare_studio_data"]
 
@@ -47,6 +36,24 @@ def test_prepare_studio_data_excludes_all_not_applicable_projects():
     assert result.empty
 
 
+def test_prepare_studio_data_handles_all_nan_status_column():
+    # An entirely blank status column arrives from read_excel as float64
+    # NaNs; rows must still aggregate (and get the review comment, since
+    # no line is completed)
+    df = pd.DataFrame([
+        _base_row('SDG5000', 'BR1', np.nan),
+        _base_row('SDG5000', 'BR2', np.nan),
+    ])
+
+    result = prepare_studio_data(df)
+    result = result.set_index('Project Ref')
+
+    assert result.loc['SDG5000', 'Lines'] == 2
+    assert result.loc['SDG5000', 'Studio Comment'] == (
+        'check all lines are approved, artwork hours may require updating'
+    )
+
+
 def test_prepare_studio_data_sets_comment_for_non_completed_statuses():
     rows = [
         _base_row('SDG1000', 'BR1', 'Completed'),
@@ -1,13 +1,14 @@
-import ast
 import io
 import math
 import os
+import re
 import tempfile
-from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+import conftest
+
 
 class _StreamlitStub:
     def __init__(self):
@@ -23,18 +24,10 @@ class _UploadedFile(io.BytesIO):
 
 
 def _load_process_timesheet():
-    module_path = Path(__file__).resolve().parents[1] / "invoice_app_v3.py"
-    source = module_path.read_text(encoding="utf-8")
-    module_ast = ast.parse(source, filename=str(module_path))
-
-    selected_nodes = [
-        node
-        for node in module_ast.body
-        if isinstance(node, ast.FunctionDef)
-        and node.name in {"round_up_to_quarter", "process_timesheet"}
-    ]
-
-    compiled = compile(ast.Module(body=selected_nodes, type_ignores=[]), str(module_path), "exec")
+    compiled = conftest.compiled_snippet(
+        ("round_up_to_quarter", "process_timesheet"),
+        assign_names=("_SDG_RE",),
+    )
 
     st_stub = _StreamlitStub()
     namespace = {
@@ -43,6 +36,7 @@ def _load_process_timesheet():
         "tempfile": tempfile,
         "os": os,
         "math": math,
+        "re": re,
         "st": st_stub,
     }
 